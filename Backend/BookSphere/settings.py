@@ -130,6 +130,17 @@ DATABASES = {
 }
 
 
+# Cache
+# Defaults to a per-process in-memory cache; set CACHE_URL (e.g. redis://...) to share it between workers.
+# The event batch endpoint only caches with a shared backend and reads the database otherwise.
+
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
+EVENT_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -177,6 +188,29 @@ MEDIA_URL = '/media/'  # URL to access media files
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # Folder to store uploaded files
 
 
+# Email
+# Point EMAIL_HOST/EMAIL_PORT at a local SMTP stand-in (e.g. `python -m aiosmtpd -n -l localhost:1025`)
+# to try the booking confirmations without a real mail server.
+
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = env('EMAIL_HOST', default='localhost')
+EMAIL_PORT = env.int('EMAIL_PORT', default=25)
+EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=False)
+EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=10)
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='BookSphere <no-reply@booksphere.local>')
+
+# Booking confirmations are queued in an outbox and drained by
+# `python manage.py send_booking_notifications` (the `worker` process in the Procfile).
+BOOKING_NOTIFICATIONS_ENABLED = env.bool('BOOKING_NOTIFICATIONS_ENABLED', default=True)
+BOOKING_NOTIFICATION_BATCH_SIZE = 50
+BOOKING_NOTIFICATION_MAX_ATTEMPTS = 5
+BOOKING_NOTIFICATION_BACKOFF_SECONDS = 30
+# How long a claimed batch stays hidden from other workers before it is retried.
+BOOKING_NOTIFICATION_LEASE_SECONDS = 600
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,7 +1,8 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Event, BookedEvent
+from .models import Event, BookedEvent, BookingNotification
 
 admin.site.register(Event)
 admin.site.register(BookedEvent)
+admin.site.register(BookingNotification)
@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+
+from .models import Event
+
+
+# Delivered once when the event is deleted; the stream ends after it.
+GONE = object()
+
+
+class Subscriber:
+    # Only the latest state matters to a client, so each subscriber keeps one
+    # payload slot instead of a queue; a burst of bookings collapses into it.
+    # Every payload carries the sequence number of the snapshot it came from,
+    # and anything older than what the client already has is dropped.
+    __slots__ = ('loop', 'ready', 'payload', 'sequence')
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.ready = asyncio.Event()
+        self.payload = None
+        self.sequence = -1
+
+    def _deliver(self, sequence, payload):
+        if sequence <= self.sequence:
+            return
+        self.sequence = sequence
+        self.payload = payload
+        self.ready.set()
+
+    def seen(self, sequence):
+        # The client was sent the snapshot taken at `sequence`; drop a pending
+        # payload that is not newer than it.
+        if sequence > self.sequence:
+            self.sequence = sequence
+            if self.payload is not GONE:
+                self.payload = None
+                self.ready.clear()
+
+    async def next_payload(self, timeout):
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.ready.clear()
+        payload, self.payload = self.payload, None
+        return payload
+
+
+class AvailabilityPublisher:
+    """In-process fan-out of seat availability to SSE subscribers.
+
+    Bookings are published from sync code (signals, possibly on a worker
+    thread), so delivery is handed to each subscriber's event loop.
+    Signals only fire for changes made in this process. Changes made by
+    other workers, hosts or shells are picked up by ``claim_resync``: while
+    an event has subscribers it is re-read at most once per interval, one
+    query per event rather than per connection.
+
+    Snapshots of one event are taken one at a time under a per-event lock
+    and numbered in that order, so clients never see an older count after
+    a newer one. Changes that arrive while a snapshot is being taken are
+    folded into the next one.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._dirty = set()
+        self._refreshed_at = {}
+        self._sequence = itertools.count()
+        self._snapshot_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def subscribe(self, event_id):
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[event_id].add(subscriber)
+            self._refreshed_at.setdefault(event_id, time.monotonic())
+        return subscriber
+
+    def unsubscribe(self, event_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(event_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[event_id]
+                    self._refreshed_at.pop(event_id, None)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def snapshot(self, event_id, take_snapshot):
+        """Take a numbered snapshot, ordered with the published ones."""
+        with self._snapshot_locks[event_id % self.LOCK_STRIPES]:
+            return next(self._sequence), take_snapshot(event_id)
+
+    def refresh(self, event_id, take_snapshot):
+        """Publish a fresh snapshot after a change has committed.
+
+        If another thread takes its snapshot after this change was marked,
+        that snapshot already includes it and this call does nothing.
+        """
+        with self._lock:
+            if event_id not in self._subscribers:
+                return False
+            self._dirty.add(event_id)
+        return self.flush(event_id, take_snapshot)
+
+    def claim_resync(self, event_id, every):
+        """Mark the event for a re-read if none happened in the last ``every`` seconds.
+
+        Cheap enough to call from the event loop; only the caller that gets
+        True goes on to ``flush``, so idle streams share one query per event.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if event_id not in self._subscribers:
+                return False
+            if now - self._refreshed_at.get(event_id, 0.0) < every:
+                return False
+            self._refreshed_at[event_id] = now
+            self._dirty.add(event_id)
+        return True
+
+    def flush(self, event_id, take_snapshot):
+        with self._snapshot_locks[event_id % self.LOCK_STRIPES]:
+            with self._lock:
+                if event_id not in self._dirty:
+                    return False
+                self._dirty.discard(event_id)
+                if event_id in self._subscribers:
+                    self._refreshed_at[event_id] = time.monotonic()
+            sequence = next(self._sequence)
+            payload = take_snapshot(event_id)
+            self._deliver(event_id, sequence, GONE if payload is None else payload)
+        return True
+
+    def _deliver(self, event_id, sequence, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event_id, ()))
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber._deliver, sequence, payload)
+
+
+publisher = AvailabilityPublisher()
+
+
+def availability_snapshot(event_id):
+    # One query for the event row and its booking count.
+    event = (
+        Event.objects.filter(pk=event_id)
+        .annotate(booked=Count('bookedevent'))
+        .values('id', 'Capacity', 'booked')
+        .first()
+    )
+    if event is None:
+        return None
+    capacity = event['Capacity']
+    return {
+        'event': event['id'],
+        'booked': event['booked'],
+        'capacity': capacity,
+        'available': None if capacity is None else max(capacity - event['booked'], 0),
+    }
+
+
+def publish_availability(event_id):
+    # Skips the query entirely when nobody is listening for this event. A
+    # deleted event is published as GONE so its streams can end.
+    publisher.refresh(event_id, availability_snapshot)
+
+
+def format_sse(payload, event='availability'):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+class AvailabilityStream:
+    """SSE chunks for one subscriber, starting with its first snapshot.
+
+    An async generator that is never iterated (the client left before the
+    body started) never runs its ``finally``, and Django does not call
+    ``aclose()`` on it. ``StreamingHttpResponse`` does register a public
+    ``close()`` on the content it is given, so the subscription is dropped
+    here when the response is closed, whether or not streaming began.
+    """
+
+    def __init__(self, event_id, subscriber, snapshot, heartbeat, resync):
+        self.event_id = event_id
+        self.subscriber = subscriber
+        self.snapshot = snapshot
+        self.heartbeat = heartbeat
+        self.resync = resync
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        try:
+            yield f"retry: 5000\n{format_sse(self.snapshot)}"
+            last_sent = self.snapshot
+            while True:
+                payload = await self.subscriber.next_payload(self.heartbeat)
+                if payload is GONE:
+                    yield format_sse({'event': self.event_id}, event='gone')
+                    return
+                if payload is not None and payload != last_sent:
+                    last_sent = payload
+                    yield format_sse(payload)
+                    continue
+                if payload is None and publisher.claim_resync(self.event_id, self.resync):
+                    await sync_to_async(publisher.flush)(self.event_id, availability_snapshot)
+                # a comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+        finally:
+            self.close()
+
+    def close(self):
+        publisher.unsubscribe(self.event_id, self.subscriber)
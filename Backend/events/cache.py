@@ -0,0 +1,83 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+EVENT_CACHE_PREFIX = 'event'
+INVALIDATE_CHUNK_SIZE = 1000
+
+# Every event has a generation token in the cache, and its representation is
+# stored under a key that includes it. Invalidation replaces the token, so a
+# fill that read the database before a change committed writes under the old
+# generation, and nobody reads that key again.
+
+
+def event_generation_key(pk):
+    return f"{EVENT_CACHE_PREFIX}-gen:{pk}"
+
+
+def event_cache_key(pk, generation):
+    return f"{EVENT_CACHE_PREFIX}:{pk}:{generation}"
+
+
+def _new_generation():
+    return uuid.uuid4().hex
+
+
+def event_cache_is_shared():
+    # Invalidation only reaches the current process with a per-process
+    # backend, so other workers would keep serving stale events.
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_cached_events(pks):
+    """Return ``(cached, generations)`` for the given event pks.
+
+    ``cached`` maps pk to the representations found in the cache, and
+    ``generations`` is what ``cache_events`` needs to store the misses.
+    Read it before querying the database.
+    """
+    if not event_cache_is_shared():
+        return {}, {}
+
+    found = cache.get_many([event_generation_key(pk) for pk in pks])
+    generations = {
+        pk: found[event_generation_key(pk)] for pk in pks if event_generation_key(pk) in found
+    }
+    for pk in pks:
+        if pk in generations:
+            continue
+        # add() cannot overwrite a token set by a concurrent invalidation;
+        # if it loses, this pk is just not cached this time.
+        generation = _new_generation()
+        if cache.add(event_generation_key(pk), generation, timeout=None):
+            generations[pk] = generation
+
+    keys = {pk: event_cache_key(pk, generation) for pk, generation in generations.items()}
+    cached = cache.get_many(list(keys.values()))
+    return {pk: cached[key] for pk, key in keys.items() if key in cached}, generations
+
+
+def cache_events(representations, generations):
+    entries = {
+        event_cache_key(pk, generations[pk]): data
+        for pk, data in representations.items() if pk in generations
+    }
+    if entries and event_cache_is_shared():
+        cache.set_many(entries, timeout=getattr(settings, 'EVENT_CACHE_TIMEOUT', 300))
+
+
+def invalidate_events(pks):
+    # A new generation per event, written with one set_many per chunk; old
+    # entries are never read again and expire on their own.
+    if not event_cache_is_shared():
+        return
+    pks = list(pks)
+    for start in range(0, len(pks), INVALIDATE_CHUNK_SIZE):
+        cache.set_many(
+            {event_generation_key(pk): _new_generation() for pk in pks[start:start + INVALIDATE_CHUNK_SIZE]},
+            timeout=None,
+        )
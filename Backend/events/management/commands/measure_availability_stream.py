@@ -0,0 +1,95 @@
+import asyncio
+import time
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from events.availability import availability_snapshot, publish_availability, publisher
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many in-process SSE availability streams through the ASGI app and report "
+        "Python memory per connection and DB queries per booking change versus polling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help="Event id to subscribe to.")
+        parser.add_argument('--subscribers', type=int, default=1000)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Client polling interval the stream replaces, in seconds.")
+
+    def handle(self, *args, **options):
+        if availability_snapshot(options['event']) is None:
+            raise CommandError(f"Event {options['event']} does not exist.")
+        asyncio.run(self.measure(options['event'], options['subscribers'], options['poll_interval']))
+
+    async def measure(self, event_id, count, poll_interval):
+        application = get_asgi_application()
+        path = f"/event/{event_id}/availability/stream/"
+        disconnect = asyncio.Event()
+        chunks = [0] * count
+        progress = asyncio.Condition()
+
+        def client(index):
+            sent_request = False
+
+            async def receive():
+                nonlocal sent_request
+                if not sent_request:
+                    sent_request = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and message.get('body'):
+                    async with progress:
+                        chunks[index] += 1
+                        progress.notify_all()
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+                'client': ('127.0.0.1', 10000 + index), 'server': ('localhost', 80),
+            }
+            return application(scope, receive, send)
+
+        async def wait_for_chunks(expected):
+            async with progress:
+                await progress.wait_for(lambda: all(seen >= expected for seen in chunks))
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tasks = [asyncio.create_task(client(index)) for index in range(count)]
+        await wait_for_chunks(1)
+        per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / count
+        tracemalloc.stop()
+
+        def fan_out():
+            with CaptureQueriesContext(connection) as queries:
+                publish_availability(event_id)
+            return len(queries)
+
+        started = time.perf_counter()
+        fan_out_queries = await sync_to_async(fan_out)()
+        await wait_for_chunks(2)
+        fan_out_ms = (time.perf_counter() - started) * 1000
+
+        disconnect.set()
+        await asyncio.gather(*tasks)
+
+        rows = [
+            ("Open streams", f"{count}"),
+            ("Python memory / connection", f"{per_connection / 1024:.1f} KiB (tracemalloc)"),
+            ("Fan-out of one change", f"{fan_out_ms:.1f} ms, {fan_out_queries} DB queries"),
+            (f"Polling every {poll_interval:g}s instead", f"{count / poll_interval:.0f} DB queries/s"),
+            ("Subscribers left after close", f"{publisher.subscriber_count()}"),
+        ]
+        for label, value in rows:
+            self.stdout.write(f"{label + ':':<32}{value}")
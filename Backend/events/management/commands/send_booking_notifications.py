@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from events.notifications import send_pending_notifications
+
+
+class Command(BaseCommand):
+    help = "Drain the booking confirmation outbox and send the emails in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'BOOKING_NOTIFICATION_BATCH_SIZE', 50))
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain what is due right now and exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        while True:
+            processed = send_pending_notifications(batch_size=batch_size)
+            if processed:
+                self.stdout.write(f"Processed {processed} notification(s).")
+                # A full batch means more may be waiting, keep draining.
+                if processed == batch_size:
+                    continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
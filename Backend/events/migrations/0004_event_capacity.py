@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_bookingnotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='Capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
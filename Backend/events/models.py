@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import CustomUser
 
 class Event(models.Model):
@@ -19,6 +20,7 @@ class Event(models.Model):
     Venue = models.CharField(max_length=255)
     Price = models.DecimalField(max_digits=10, decimal_places=2)
     Image = models.ImageField(upload_to='event_images/')
+    Capacity = models.PositiveIntegerField(null=True, blank=True)  # None means unlimited seats
 
     def __str__(self):
         return f"{self.Name} - {self.category}"
@@ -30,4 +32,39 @@ class BookedEvent(models.Model):
     booking_date = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.user} booked {self.event.Name} on {self.booking_date}"
\ No newline at end of file
+        return f"{self.user} booked {self.event.Name} on {self.booking_date}"
+
+
+class BookingNotification(models.Model):
+    """Outbox row written in the same transaction as the booking it confirms.
+
+    A background worker (``manage.py send_booking_notifications``) drains the
+    pending rows in batches, so SMTP latency never sits on the booking request.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+        CANCELLED = 'cancelled', 'Cancelled'
+
+    booked_event = models.ForeignKey(BookedEvent, null=True, on_delete=models.SET_NULL)
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(
+            max_length=10,
+            choices=Status.choices,
+            default=Status.PENDING
+        )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.status})"
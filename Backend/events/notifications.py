@@ -0,0 +1,153 @@
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BookingNotification
+
+
+def queue_booking_confirmation(booked_event):
+    # Called inside the booking transaction: the outbox row commits (or rolls
+    # back) together with the booking, no SMTP work happens here.
+    if not getattr(settings, 'BOOKING_NOTIFICATIONS_ENABLED', True):
+        return None
+    user = booked_event.user
+    if not user.email:
+        return None
+    event = booked_event.event
+    return BookingNotification.objects.create(
+        booked_event=booked_event,
+        recipient=user.email,
+        subject=f"Booking confirmed: {event.Name}",
+        body=(
+            f"Hi {user.username},\n\n"
+            f"Your booking for {event.Name} on {event.Date:%Y-%m-%d %H:%M} "
+            f"at {event.Venue} is confirmed.\n"
+        ),
+    )
+
+
+def _backoff(attempts):
+    base = getattr(settings, 'BOOKING_NOTIFICATION_BACKOFF_SECONDS', 30)
+    return timedelta(seconds=base * (2 ** (attempts - 1)))
+
+
+def _claim_batch(batch_size):
+    """Lease a batch of due notifications in a short transaction.
+
+    Pushing ``next_attempt_at`` forward hides the rows from other workers
+    while they are being sent; if this worker dies, they become due again
+    once the lease runs out.
+    """
+    lease = timedelta(seconds=getattr(settings, 'BOOKING_NOTIFICATION_LEASE_SECONDS', 600))
+    with transaction.atomic():
+        # skip_locked lets several workers claim batches without waiting on each other.
+        batch = list(
+            BookingNotification.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=BookingNotification.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        if not batch:
+            return [], []
+
+        # the booking was cancelled before the worker got to it
+        cancelled = [n for n in batch if n.booked_event_id is None]
+        claimed = [n for n in batch if n.booked_event_id is not None]
+        BookingNotification.objects.filter(pk__in=[n.pk for n in cancelled]).update(
+            status=BookingNotification.Status.CANCELLED
+        )
+        BookingNotification.objects.filter(pk__in=[n.pk for n in claimed]).update(
+            next_attempt_at=timezone.now() + lease
+        )
+    return claimed, cancelled
+
+
+def send_pending_notifications(batch_size=None, connection=None):
+    """Send one batch of due notifications over a single SMTP connection.
+
+    Rows are claimed in their own transaction and the SMTP work happens
+    outside of it, so no row locks are held while talking to the server.
+    Returns the number of notifications processed (sent, rescheduled or
+    cancelled).
+    """
+    batch_size = batch_size or getattr(settings, 'BOOKING_NOTIFICATION_BATCH_SIZE', 50)
+    max_attempts = getattr(settings, 'BOOKING_NOTIFICATION_MAX_ATTEMPTS', 5)
+
+    batch, cancelled = _claim_batch(batch_size)
+    if not batch:
+        return len(cancelled)
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # The server is unreachable: reschedule the whole batch at once.
+        for notification in batch:
+            _record_failure(notification, exc, max_attempts)
+    else:
+        try:
+            _send_batch(connection, batch, max_attempts)
+        finally:
+            connection.close()
+
+    BookingNotification.objects.bulk_update(
+        batch,
+        ['status', 'attempts', 'next_attempt_at', 'sent_at', 'last_error'],
+    )
+    return len(batch) + len(cancelled)
+
+
+def _send_batch(connection, batch, max_attempts):
+    reconnected = False
+    pending = list(batch)
+    while pending:
+        notification = pending[0]
+        message = EmailMessage(
+            subject=notification.subject,
+            body=notification.body,
+            to=[notification.recipient],
+            connection=connection,
+        )
+        try:
+            connection.send_messages([message])
+        except SMTPServerDisconnected:
+            # The backend keeps the dead socket, so every later send would fail
+            # too. Reconnect once; if that does not help, hand the unsent rows
+            # back without spending one of their attempts.
+            connection.close()
+            if not reconnected:
+                reconnected = True
+                try:
+                    connection.open()
+                    continue
+                except Exception:
+                    pass
+            _release(pending)
+            return
+        except Exception as exc:
+            _record_failure(notification, exc, max_attempts)
+        else:
+            notification.status = BookingNotification.Status.SENT
+            notification.attempts += 1
+            notification.sent_at = timezone.now()
+            notification.last_error = ''
+        pending.pop(0)
+
+
+def _release(notifications):
+    retry_at = timezone.now() + _backoff(1)
+    for notification in notifications:
+        notification.next_attempt_at = retry_at
+
+
+def _record_failure(notification, exc, max_attempts):
+    notification.attempts += 1
+    notification.last_error = str(exc)
+    if notification.attempts >= max_attempts:
+        notification.status = BookingNotification.Status.FAILED
+    else:
+        notification.next_attempt_at = timezone.now() + _backoff(notification.attempts)
@@ -3,6 +3,10 @@ from .models import Event, BookedEvent
 from django.core.exceptions import ValidationError
 
 
+# largest value a BigAutoField primary key can hold
+MAX_EVENT_ID = 2 ** 63 - 1
+
+
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
@@ -39,3 +43,98 @@ class BookeventListSerializer(serializers.ModelSerializer):
         Event.objects.filter(pk=instance.event.pk).update(IS_booked=True)
         return super().update(instance, validated_data)
     
+
+
+class EventBulkFilterSerializer(serializers.Serializer):
+    category = serializers.ChoiceField(choices=Event.EventCategory.choices, required=False)
+    Venue = serializers.CharField(max_length=255, required=False)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Provide at least one filter field.")
+        return data
+
+    @staticmethod
+    def to_lookups(data):
+        lookups = {}
+        if 'category' in data:
+            lookups['category'] = data['category']
+        if 'Venue' in data:
+            lookups['Venue'] = data['Venue']
+        if 'date_from' in data:
+            lookups['Date__gte'] = data['date_from']
+        if 'date_to' in data:
+            lookups['Date__lte'] = data['date_to']
+        return lookups
+
+
+class EventBulkChangesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Event
+        fields = ['Price', 'Date', 'Venue', 'category']
+        extra_kwargs = {field: {'required': False} for field in fields}
+
+    # reject keys outside Meta.fields instead of silently dropping them
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = set(data) - set(self.Meta.fields)
+            if unknown:
+                raise serializers.ValidationError({
+                    field: ["This field cannot be changed in bulk."] for field in sorted(unknown)
+                })
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Provide at least one field to change.")
+        return data
+
+
+class EventBulkUpdateSerializer(serializers.Serializer):
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_EVENT_ID),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_IDS,
+    )
+    filter = EventBulkFilterSerializer(required=False)
+    changes = EventBulkChangesSerializer()
+
+    # either an explicit id list or a filter, never both
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError(
+                "Provide either 'ids' or 'filter'."
+            )
+        return data
+
+    def get_queryset(self):
+        data = self.validated_data
+        if 'ids' in data:
+            return Event.objects.filter(pk__in=data['ids'])
+        return Event.objects.filter(**EventBulkFilterSerializer.to_lookups(data['filter']))
+
+
+class EventBatchQuerySerializer(serializers.Serializer):
+    MAX_IDS = 300
+
+    ids = serializers.CharField(help_text="Comma-separated event ids, e.g. `?ids=3,1,2`.")
+
+    # "3,1,3,2" -> [3, 1, 2], keeping the requested order
+    def validate_ids(self, value):
+        try:
+            ids = [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Ids must be integers.")
+        ids = list(dict.fromkeys(ids))
+        if any(pk < 1 or pk > MAX_EVENT_ID for pk in ids):
+            raise serializers.ValidationError(f"Ids must be between 1 and {MAX_EVENT_ID}.")
+        if not ids:
+            raise serializers.ValidationError("Provide at least one id.")
+        if len(ids) > self.MAX_IDS:
+            raise serializers.ValidationError(f"At most {self.MAX_IDS} ids per request.")
+        return ids
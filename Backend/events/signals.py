@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability import publish_availability
+from .cache import invalidate_events
+from .models import Event, BookedEvent
+
+
+# Availability is pushed once per change, whatever the number of open
+# streams, instead of every client polling the database.
+def _publish_after_commit(event_id):
+    transaction.on_commit(lambda: publish_availability(event_id))
+
+
+# Covers the single-event view and the admin; queryset update() does not send
+# signals, so bulk updates invalidate explicitly. A Capacity change or a
+# deletion also reaches the open availability streams.
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_events([pk]))
+    _publish_after_commit(pk)
+
+
+@receiver(post_save, sender=BookedEvent)
+def publish_on_booking(sender, instance, created, **kwargs):
+    if created:
+        _publish_after_commit(instance.event_id)
+
+
+@receiver(post_delete, sender=BookedEvent)
+def publish_on_cancellation(sender, instance, **kwargs):
+    _publish_after_commit(instance.event_id)
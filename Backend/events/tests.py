@@ -1,3 +1,214 @@
-from django.test import TestCase
+from datetime import timedelta
+from smtplib import SMTPException, SMTPServerDisconnected
 
-# Create your tests here.
+from django.core import mail
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from .models import Event, BookedEvent, BookingNotification
+from .notifications import send_pending_notifications
+from .availability import GONE, AvailabilityPublisher, AvailabilityStream, publisher
+
+
+def make_event(**kwargs):
+    fields = {
+        'Name': 'Concert',
+        'Description': 'Live music',
+        'Date': timezone.now() + timedelta(days=7),
+        'Venue': 'Main Hall',
+        'Price': '20.00',
+        'Image': 'event_images/concert.jpg',
+    }
+    fields.update(kwargs)
+    return Event.objects.create(**fields)
+
+
+class FailingConnection:
+    """Stand-in SMTP connection whose sends raise ``error``."""
+
+    def __init__(self, error):
+        self.error = error
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise self.error
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class BookingNotificationTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('alice', email='alice@example.com', password='pw')
+        self.event = make_event()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self):
+        return BookedEvent.objects.create(user=self.user, event=self.event)
+
+    def queue(self, booked_event):
+        return BookingNotification.objects.create(
+            booked_event=booked_event, recipient=self.user.email, subject='Booking confirmed', body='Hi',
+        )
+
+    def test_booking_writes_outbox_row_and_worker_sends_it(self):
+        response = self.client.post('/event/book/', {'event': self.event.pk})
+
+        self.assertEqual(response.status_code, 201)
+        notification = BookingNotification.objects.get()
+        self.assertEqual(notification.status, BookingNotification.Status.PENDING)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(send_pending_notifications(), 1)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, BookingNotification.Status.SENT)
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['alice@example.com'])
+        self.assertIn(self.event.Name, mail.outbox[0].subject)
+
+    @override_settings(BOOKING_NOTIFICATION_BACKOFF_SECONDS=30)
+    def test_failed_send_is_retried_with_backoff(self):
+        notification = self.queue(self.book())
+
+        send_pending_notifications(connection=FailingConnection(SMTPException('mailbox busy')))
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, BookingNotification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.last_error, 'mailbox busy')
+        self.assertGreater(notification.next_attempt_at, timezone.now() + timedelta(seconds=20))
+        # not due yet, so the next run leaves it alone
+        self.assertEqual(send_pending_notifications(), 0)
+
+    @override_settings(BOOKING_NOTIFICATION_MAX_ATTEMPTS=2)
+    def test_notification_is_marked_failed_after_max_attempts(self):
+        notification = self.queue(self.book())
+
+        for _ in range(2):
+            BookingNotification.objects.filter(pk=notification.pk).update(next_attempt_at=timezone.now())
+            send_pending_notifications(connection=FailingConnection(SMTPException('rejected')))
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, BookingNotification.Status.FAILED)
+        self.assertEqual(notification.attempts, 2)
+
+    def test_dropped_connection_gives_rows_back_without_spending_attempts(self):
+        booking = self.book()
+        first, second = self.queue(booking), self.queue(booking)
+        connection = FailingConnection(SMTPServerDisconnected('Connection unexpectedly closed'))
+
+        send_pending_notifications(connection=connection)
+
+        # one reconnect, then the batch is handed back
+        self.assertEqual(connection.opened, 2)
+        for notification in (first, second):
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, BookingNotification.Status.PENDING)
+            self.assertEqual(notification.attempts, 0)
+            self.assertGreater(notification.next_attempt_at, timezone.now())
+
+    def test_cancelled_booking_is_not_confirmed(self):
+        booking = self.book()
+        notification = self.queue(booking)
+        booking.delete()
+
+        self.assertEqual(send_pending_notifications(), 1)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, BookingNotification.Status.CANCELLED)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class SoldOutTests(TestCase):
+
+    def test_booking_is_rejected_once_capacity_is_reached(self):
+        event = make_event(Capacity=1)
+        first = CustomUser.objects.create_user('first', password='pw')
+        second = CustomUser.objects.create_user('second', password='pw')
+        client = APIClient()
+
+        client.force_authenticate(first)
+        self.assertEqual(client.post('/event/book/', {'event': event.pk}).status_code, 201)
+
+        client.force_authenticate(second)
+        response = client.post('/event/book/', {'event': event.pk})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'non_field_errors': ['This event is sold out.']})
+        self.assertEqual(BookedEvent.objects.filter(event=event).count(), 1)
+
+
+class AvailabilitySubscriberTests(SimpleTestCase):
+
+    async def test_older_sequence_is_dropped_after_seen(self):
+        subscriber = AvailabilityPublisher().subscribe(1)
+
+        subscriber._deliver(3, {'booked': 1})
+        subscriber.seen(5)
+        self.assertIsNone(await subscriber.next_payload(0.01))
+
+        subscriber._deliver(4, {'booked': 1})
+        self.assertIsNone(await subscriber.next_payload(0.01))
+
+        subscriber._deliver(7, {'booked': 2})
+        subscriber._deliver(6, {'booked': 1})
+        self.assertEqual(await subscriber.next_payload(0.01), {'booked': 2})
+
+    async def test_refresh_publishes_snapshots_in_order(self):
+        availability = AvailabilityPublisher()
+        subscriber = availability.subscribe(1)
+        snapshots = iter([{'booked': 1}, {'booked': 2}])
+
+        sequence, _ = availability.snapshot(1, lambda event_id: {'booked': 0})
+        subscriber.seen(sequence)
+        self.assertTrue(availability.refresh(1, lambda event_id: next(snapshots)))
+        self.assertTrue(availability.refresh(1, lambda event_id: next(snapshots)))
+
+        self.assertEqual(await subscriber.next_payload(0.1), {'booked': 2})
+
+    async def test_refresh_without_subscribers_skips_the_snapshot(self):
+        def take_snapshot(event_id):
+            raise AssertionError("no snapshot expected")
+
+        self.assertFalse(AvailabilityPublisher().refresh(1, take_snapshot))
+
+    async def test_resync_is_claimed_once_per_interval(self):
+        availability = AvailabilityPublisher()
+        availability.subscribe(1)
+        availability.subscribe(1)
+
+        self.assertFalse(availability.claim_resync(1, every=60))
+        self.assertTrue(availability.claim_resync(1, every=0))
+        self.assertFalse(availability.claim_resync(1, every=60))
+        self.assertFalse(availability.claim_resync(2, every=0))
+
+    async def test_gone_ends_the_stream_and_unsubscribes(self):
+        subscriber = publisher.subscribe(42)
+        stream = AvailabilityStream(42, subscriber, {'event': 42, 'booked': 0}, heartbeat=5, resync=60)
+        chunks = stream.__aiter__()
+
+        self.assertIn('event: availability', await chunks.__anext__())
+        subscriber._deliver(subscriber.sequence + 1, GONE)
+        self.assertIn('event: gone', await chunks.__anext__())
+        with self.assertRaises(StopAsyncIteration):
+            await chunks.__anext__()
+        self.assertEqual(publisher.subscriber_count(), 0)
+
+    async def test_closing_an_unstarted_stream_unsubscribes(self):
+        subscriber = publisher.subscribe(43)
+        stream = AvailabilityStream(43, subscriber, {'event': 43, 'booked': 0}, heartbeat=5, resync=60)
+
+        stream.close()
+
+        self.assertEqual(publisher.subscriber_count(), 0)
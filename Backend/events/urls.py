@@ -1,11 +1,15 @@
 from django.urls import path
 from .views import (
-    Update_Delete_Event_View, Create_Read_Event_View, BookedEventListView
+    Update_Delete_Event_View, Create_Read_Event_View, BookedEventListView,
+    Bulk_Update_Event_View, Batch_Read_Event_View, Event_Availability_Stream_View
 )
 
 urlpatterns = [
 
     path('udateORdelete/<int:pk>/', Update_Delete_Event_View.as_view(),name='filter-list-by-category'),
+    path('bulk-update/', Bulk_Update_Event_View.as_view(), name='event-bulk-update'),
+    path('batch/', Batch_Read_Event_View.as_view(), name='event-batch'),
+    path('<int:pk>/availability/stream/', Event_Availability_Stream_View.as_view(), name='event-availability-stream'),
     path('createORread/', Create_Read_Event_View.as_view(), name='event-list'),
     path('book/', BookedEventListView.as_view(), name='event-list'),
 ]
\ No newline at end of file
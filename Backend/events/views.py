@@ -1,10 +1,21 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.views import View
+from django.db import transaction
 # from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, filters
-from rest_framework import permissions
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from .models import Event, BookedEvent
-from .serializers import EventSerializer, BookeventListSerializer
+from .serializers import (
+    EventSerializer, BookeventListSerializer, EventBulkUpdateSerializer, EventBatchQuerySerializer
+)
+from .cache import cache_events, get_cached_events, invalidate_events
+from .notifications import queue_booking_confirmation
+from .availability import AvailabilityStream, availability_snapshot, publisher
 
 
 
@@ -18,6 +29,59 @@ class Update_Delete_Event_View(generics.RetrieveUpdateDestroyAPIView):
     
 
 
+class Bulk_Update_Event_View(generics.GenericAPIView):
+    serializer_class = EventBulkUpdateSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data['changes']
+
+        # One locked SELECT and one set-based UPDATE on the same queryset,
+        # instead of a fetch + save + serializer round trip per event. The
+        # pks are only kept to drop the cached copies afterwards.
+        with transaction.atomic():
+            queryset = serializer.get_queryset().select_for_update()
+            pks = list(queryset.values_list('pk', flat=True))
+            updated = queryset.update(**changes)
+            transaction.on_commit(lambda: invalidate_events(pks))
+
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+
+class Batch_Read_Event_View(generics.GenericAPIView):
+    serializer_class = EventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        query = EventBatchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        ids = query.validated_data['ids']
+
+        found, generations = get_cached_events(ids)
+        misses = [pk for pk in ids if pk not in found]
+        if misses:
+            # Serialized without the request so the cached representation does
+            # not depend on the host it was first requested from; the image
+            # URL is made absolute below, like the other event endpoints.
+            fetched = {
+                event.pk: EventSerializer(event).data
+                for event in Event.objects.filter(id__in=misses)
+            }
+            cache_events(fetched, generations)
+            found.update(fetched)
+
+        return Response({
+            'results': [self.absolute_image(found[pk]) for pk in ids if pk in found],
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+    def absolute_image(self, data):
+        if not data.get('Image'):
+            return data
+        return {**data, 'Image': self.request.build_absolute_uri(data['Image'])}
+
 
 class Create_Read_Event_View(generics.ListCreateAPIView):
     queryset = Event.objects.all()
@@ -40,8 +104,46 @@ class BookedEventListView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         # The user is automatically set in the serializer's create()
-        serializer.save()
-    
-    
-   
-    
\ No newline at end of file
+        # The confirmation email goes through the outbox, written in the same
+        # transaction and sent later by `manage.py send_booking_notifications`.
+        with transaction.atomic():
+            # Lock the event row so concurrent bookings check the seat count
+            # one at a time; checking in validate() without the lock oversells.
+            event = Event.objects.select_for_update().get(pk=serializer.validated_data['event'].pk)
+            if event.Capacity is not None and BookedEvent.objects.filter(event=event).count() >= event.Capacity:
+                raise ValidationError({'non_field_errors': ["This event is sold out."]})
+            booking = serializer.save()
+            queue_booking_confirmation(booking)
+
+
+class Event_Availability_Stream_View(View):
+    """Server-Sent Events stream of seat availability for one event.
+
+    Needs the ASGI application (``BookSphere.asgi``): each open stream is an
+    idle coroutine waiting on the in-process publisher, not a worker.
+    """
+    HEARTBEAT_SECONDS = 15
+    # Re-read an idle event this often to pick up changes from other processes.
+    RESYNC_SECONDS = 30
+
+    async def get(self, request, pk):
+        # Subscribe before reading the snapshot, so a booking that commits in
+        # between is still delivered instead of being lost.
+        subscriber = publisher.subscribe(pk)
+        try:
+            sequence, snapshot = await sync_to_async(publisher.snapshot)(pk, availability_snapshot)
+        except BaseException:
+            publisher.unsubscribe(pk, subscriber)
+            raise
+        if snapshot is None:
+            publisher.unsubscribe(pk, subscriber)
+            return JsonResponse({'detail': 'No Event matches the given query.'}, status=404)
+        subscriber.seen(sequence)
+
+        response = StreamingHttpResponse(
+            AvailabilityStream(pk, subscriber, snapshot, self.HEARTBEAT_SECONDS, self.RESYNC_SECONDS),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response